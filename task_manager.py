@@ -1,23 +1,63 @@
 import datetime
 import json
-from dataclasses import dataclass, field, asdict
-from typing import List, Dict
+from dataclasses import dataclass, field
+from typing import List, Dict, Optional
 from enum import Enum
 import sqlite3
 import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from email.header import Header
 import os
-import configparser
+import heapq
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+TASK_COLUMNS = "id, title, description, deadline, priority, assigned_to, status, created_at"
+REMINDER_WORKERS = 4
+SCHEMA_VERSION = 1
+TASKS_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY,
+        title TEXT,
+        description TEXT,
+        deadline DATE,
+        priority INTEGER,
+        assigned_to TEXT,
+        status TEXT,
+        created_at DATETIME
+    )
+'''
+EMAIL_TEMPLATE = "\r\n".join([
+    "From: {sender}",
+    "To: {receiver}",
+    "Subject: {subject}",
+    "MIME-Version: 1.0",
+    "Content-Type: text/plain; charset=utf-8",
+    "Content-Transfer-Encoding: 8bit",
+    "",
+    "Dear {name},",
+    "",
+    "This is a reminder that the following task is due soon:",
+    "",
+    "Title: {title}",
+    "Description: {description}",
+    "Deadline: {deadline}",
+    "Priority: {priority}",
+    "",
+    "Please ensure this task is completed on time.",
+    "",
+    "Best regards,",
+    "Task Management System",
+    ""
+])
 
 class Priority(Enum):
     LOW = 1
     MEDIUM = 2
     HIGH = 3
 
-@dataclass
+@dataclass(slots=True)
 class Task:
-    id: int
+    id: Optional[int]
     title: str
     description: str
     deadline: datetime.date
@@ -28,18 +68,23 @@ class Task:
 
     def to_dict(self):
         return {
-            **asdict(self),
-            'priority': self.priority.name,
+            'id': self.id,
+            'title': self.title,
+            'description': self.description,
             'deadline': self.deadline.isoformat(),
+            'priority': self.priority.name,
+            'assigned_to': self.assigned_to,
+            'status': self.status,
             'created_at': self.created_at.isoformat()
         }
 
-@dataclass
+@dataclass(slots=True)
 class TeamMember:
     name: str
     email: str
-    tasks: List[Task] = field(default_factory=list)
     workload: int = 0
+    completed_tasks: int = 0
+    total_tasks: int = 0
 
     def to_dict(self):
         return {
@@ -52,24 +97,24 @@ class TaskManager:
     def __init__(self, db_name='task_manager.db'):
         self.db_name = db_name
         self.conn = sqlite3.connect(db_name)
+        self.configure_connection()
         self.create_tables()
         self.load_data()
-        self.config = self.load_config()
+        self._config = None
+
+    def configure_connection(self):
+        cursor = self.conn.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA cache_size=-20000")
+        cursor.execute("PRAGMA foreign_keys=ON")
 
     def create_tables(self):
+        self.migrate_schema()
         cursor = self.conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS tasks (
-                id INTEGER PRIMARY KEY,
-                title TEXT,
-                description TEXT,
-                deadline DATE,
-                priority TEXT,
-                assigned_to TEXT,
-                status TEXT,
-                created_at DATETIME
-            )
-        ''')
+        cursor.execute(TASKS_TABLE_SQL.format(table='tasks'))
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS team_members (
                 name TEXT PRIMARY KEY,
@@ -77,53 +122,110 @@ class TaskManager:
                 workload INTEGER
             )
         ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_tasks_assigned ON tasks(assigned_to)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_tasks_deadline ON tasks(deadline)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_tasks_priority_deadline ON tasks(priority, deadline)")
         self.conn.commit()
 
+    def migrate_schema(self):
+        cursor = self.conn.cursor()
+        cursor.execute("PRAGMA user_version")
+        if cursor.fetchone()[0] >= SCHEMA_VERSION:
+            return
+
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tasks'")
+        has_tasks = cursor.fetchone() is not None
+        names = [priority.name for priority in Priority]
+        if has_tasks:
+            placeholders = ", ".join("?" * len(names))
+            cursor.execute(f"SELECT DISTINCT priority FROM tasks WHERE priority NOT IN ({placeholders})", names)
+            unknown = [row[0] for row in cursor.fetchall()]
+            if unknown:
+                raise ValueError(f"Cannot migrate tasks table: unknown priority values {unknown}")
+
+        with self.conn:
+            cursor.execute("BEGIN")
+            if has_tasks:
+                # Version 1 stores priority as the Priority enum value instead of its name.
+                cursor.execute(TASKS_TABLE_SQL.format(table='tasks_v1'))
+                cases = " ".join(f"WHEN '{priority.name}' THEN {priority.value}" for priority in Priority)
+                cursor.execute(f'''
+                    INSERT INTO tasks_v1 ({TASK_COLUMNS})
+                    SELECT id, title, description, deadline, CASE priority {cases} END,
+                           assigned_to, status, created_at
+                    FROM tasks
+                ''')
+                cursor.execute("DROP TABLE tasks")
+                cursor.execute("ALTER TABLE tasks_v1 RENAME TO tasks")
+            cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
     def load_data(self):
-        self.tasks = []
         self.team_members = {}
-        
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM tasks")
-        for row in cursor.fetchall():
-            task = Task(
-                id=row[0],
-                title=row[1],
-                description=row[2],
-                deadline=datetime.date.fromisoformat(row[3]),
-                priority=Priority[row[4]],
-                assigned_to=row[5],
-                status=row[6],
-                created_at=datetime.datetime.fromisoformat(row[7])
-            )
-            self.tasks.append(task)
+        self._report_cache = None
 
+        cursor = self.conn.cursor()
         cursor.execute("SELECT * FROM team_members")
         for row in cursor.fetchall():
             team_member = TeamMember(name=row[0], email=row[1], workload=row[2])
             self.team_members[row[0]] = team_member
 
-    def save_data(self):
+        cursor.execute("SELECT assigned_to, COUNT(*), SUM(status = 'Completed') FROM tasks GROUP BY assigned_to")
+        for assigned_to, total_tasks, completed_tasks in cursor.fetchall():
+            if assigned_to in self.team_members:
+                self.team_members[assigned_to].total_tasks = total_tasks
+                self.team_members[assigned_to].completed_tasks = completed_tasks
+        self._member_heap = [(member.workload, member.name) for member in self.team_members.values()]
+        heapq.heapify(self._member_heap)
+
+    def _row_to_task(self, row) -> Task:
+        return Task(
+            id=row[0],
+            title=row[1],
+            description=row[2],
+            deadline=datetime.date.fromisoformat(row[3]),
+            priority=Priority(row[4]),
+            assigned_to=row[5],
+            status=row[6],
+            created_at=datetime.datetime.fromisoformat(row[7])
+        )
+
+    def _insert_task(self, task: Task):
         cursor = self.conn.cursor()
-        cursor.execute("DELETE FROM tasks")
-        cursor.execute("DELETE FROM team_members")
-        
-        for task in self.tasks:
-            cursor.execute('''
-                INSERT INTO tasks (id, title, description, deadline, priority, assigned_to, status, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (task.id, task.title, task.description, task.deadline.isoformat(), task.priority.name,
-                  task.assigned_to, task.status, task.created_at.isoformat()))
+        cursor.execute('''
+            INSERT INTO tasks (title, description, deadline, priority, assigned_to, status, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (task.title, task.description, task.deadline.isoformat(), task.priority.value,
+              task.assigned_to, task.status, task.created_at.isoformat()))
+        task.id = cursor.lastrowid
 
-        for member in self.team_members.values():
-            cursor.execute('''
-                INSERT INTO team_members (name, email, workload)
-                VALUES (?, ?, ?)
-            ''', (member.name, member.email, member.workload))
+    def _update_task_status(self, task_id: int, status: str):
+        cursor = self.conn.cursor()
+        cursor.execute("UPDATE tasks SET status = ? WHERE id = ?", (status, task_id))
 
-        self.conn.commit()
+    def _update_task_assignee(self, task_id: int, assigned_to: str):
+        cursor = self.conn.cursor()
+        cursor.execute("UPDATE tasks SET assigned_to = ? WHERE id = ?", (assigned_to, task_id))
+
+    def _insert_member(self, member: TeamMember):
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            INSERT INTO team_members (name, email, workload)
+            VALUES (?, ?, ?)
+        ''', (member.name, member.email, member.workload))
+
+    def _update_member_workload(self, name: str, workload: int):
+        cursor = self.conn.cursor()
+        cursor.execute("UPDATE team_members SET workload = ? WHERE name = ?", (workload, name))
+
+    @property
+    def config(self):
+        if self._config is None:
+            self._config = self.load_config()
+        return self._config
 
     def load_config(self):
+        import configparser
+
         config = configparser.ConfigParser()
         if os.path.exists('config.ini'):
             config.read('config.ini')
@@ -138,68 +240,132 @@ class TaskManager:
             self.config.write(configfile)
 
     def add_task(self, title: str, description: str, deadline: datetime.date, priority: Priority, assigned_to: str) -> Task:
-        task_id = max([task.id for task in self.tasks], default=0) + 1
-        task = Task(task_id, title, description, deadline, priority, assigned_to)
-        self.tasks.append(task)
         if assigned_to not in self.team_members:
             raise ValueError(f"Team member {assigned_to} does not exist")
-        self.team_members[assigned_to].tasks.append(task)
-        self.team_members[assigned_to].workload += priority.value
-        self.save_data()
+        member = self.team_members[assigned_to]
+        task = Task(None, title, description, deadline, priority, assigned_to)
+        with self.conn:
+            self._insert_task(task)
+            self._update_member_workload(assigned_to, member.workload + priority.value)
+        member.workload += priority.value
+        self._count_task(assigned_to, task.status, 1)
+        self._report_cache = None
         return task
 
     def update_task_status(self, task_id: int, new_status: str):
-        for task in self.tasks:
-            if task.id == task_id:
-                task.status = new_status
-                self.save_data()
-                break
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT status, assigned_to FROM tasks WHERE id = ?", (task_id,))
+        row = cursor.fetchone()
+        if row:
+            old_status, assigned_to = row
+            with self.conn:
+                self._update_task_status(task_id, new_status)
+            member = self.team_members.get(assigned_to)
+            if member and (old_status == "Completed") != (new_status == "Completed"):
+                member.completed_tasks += 1 if new_status == "Completed" else -1
+            self._report_cache = None
+
+    def _count_task(self, member_name: str, status: str, delta: int):
+        member = self.team_members.get(member_name)
+        if member:
+            member.total_tasks += delta
+            if status == "Completed":
+                member.completed_tasks += delta
 
     def get_tasks_by_priority(self, priority: Priority) -> List[Task]:
-        return [task for task in self.tasks if task.priority == priority]
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT {TASK_COLUMNS} FROM tasks WHERE priority = ? ORDER BY deadline", (priority.value,))
+        return [self._row_to_task(row) for row in cursor.fetchall()]
 
     def get_upcoming_deadlines(self, days: int) -> List[Task]:
         today = datetime.date.today()
         deadline = today + datetime.timedelta(days=days)
-        return [task for task in self.tasks if today <= task.deadline <= deadline]
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT {TASK_COLUMNS} FROM tasks WHERE deadline BETWEEN ? AND ? ORDER BY deadline",
+                       (today.isoformat(), deadline.isoformat()))
+        return [self._row_to_task(row) for row in cursor.fetchall()]
 
     def generate_to_do_list(self, team_member: str) -> List[Task]:
         if team_member in self.team_members:
-            return sorted(self.team_members[team_member].tasks, key=lambda x: (x.priority.value, x.deadline), reverse=True)
+            cursor = self.conn.cursor()
+            cursor.execute(f"SELECT {TASK_COLUMNS} FROM tasks WHERE assigned_to = ? ORDER BY priority DESC, deadline DESC",
+                           (team_member,))
+            return [self._row_to_task(row) for row in cursor.fetchall()]
         return []
 
     def allocate_task(self, task: Task):
-        team_member = min(self.team_members.values(), key=lambda x: x.workload)
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT status, assigned_to FROM tasks WHERE id = ?", (task.id,))
+        row = cursor.fetchone()
+        if not row:
+            raise ValueError(f"Task {task.id} does not exist")
+        if not self._member_heap:
+            raise ValueError("No team members available")
+        # Each member has exactly one heap entry; add_task may have raised a
+        # workload since it was pushed, so refresh stale entries until the top is current.
+        while self._member_heap[0][0] != self.team_members[self._member_heap[0][1]].workload:
+            name = self._member_heap[0][1]
+            heapq.heapreplace(self._member_heap, (self.team_members[name].workload, name))
+        team_member = self.team_members[self._member_heap[0][1]]
+        with self.conn:
+            self._update_task_assignee(task.id, team_member.name)
+            self._update_member_workload(team_member.name, team_member.workload + task.priority.value)
+        task.status = row[0]
+        self._count_task(row[1], task.status, -1)
+        self._count_task(team_member.name, task.status, 1)
         task.assigned_to = team_member.name
-        team_member.tasks.append(task)
         team_member.workload += task.priority.value
-        self.save_data()
+        heapq.heapreplace(self._member_heap, (team_member.workload, team_member.name))
+        self._report_cache = None
 
     def add_team_member(self, name: str, email: str):
         if name not in self.team_members:
-            self.team_members[name] = TeamMember(name, email)
-            self.save_data()
+            member = TeamMember(name, email)
+            with self.conn:
+                self._insert_member(member)
+            self.team_members[name] = member
+            heapq.heappush(self._member_heap, (0, name))
+            self._report_cache = None
         else:
             raise ValueError(f"Team member {name} already exists")
 
     def generate_productivity_report(self) -> Dict:
+        if self._report_cache is None:
+            self._report_cache = self._build_productivity_report()
+        # Copy so callers cannot alter the cached report.
+        return {name: dict(stats) for name, stats in self._report_cache.items()}
+
+    def _build_productivity_report(self) -> Dict:
         report = {}
         for member in self.team_members.values():
-            completed_tasks = len([task for task in member.tasks if task.status == "Completed"])
-            total_tasks = len(member.tasks)
-            if total_tasks > 0:
-                completion_rate = completed_tasks / total_tasks
+            if member.total_tasks > 0:
+                completion_rate = member.completed_tasks / member.total_tasks
             else:
                 completion_rate = 0
             report[member.name] = {
-                "completed_tasks": completed_tasks,
-                "total_tasks": total_tasks,
+                "completed_tasks": member.completed_tasks,
+                "total_tasks": member.total_tasks,
                 "completion_rate": completion_rate,
                 "workload": member.workload
             }
         return report
 
-    def send_reminder_email(self, task: Task):
+    def _smtp_login(self) -> smtplib.SMTP_SSL:
+        server = smtplib.SMTP_SSL("smtp.gmail.com", 465)
+        try:
+            server.login(self.config['EMAIL']['sender_email'], self.config['EMAIL']['sender_password'])
+        except Exception:
+            server.close()
+            raise
+        return server
+
+    def _smtp_logout(self, server: smtplib.SMTP_SSL):
+        try:
+            server.quit()
+        except smtplib.SMTPServerDisconnected:
+            server.close()
+
+    def send_reminder_email(self, task: Task, server: smtplib.SMTP_SSL = None):
         sender_email = self.config['EMAIL']['sender_email']
         sender_password = self.config['EMAIL']['sender_password']
 
@@ -208,42 +374,107 @@ class TaskManager:
             return
 
         receiver_email = self.team_members[task.assigned_to].email
-        message = MIMEMultipart()
-        message["From"] = sender_email
-        message["To"] = receiver_email
-        message["Subject"] = f"Reminder: Task '{task.title}' Due Soon"
-
-        body = f"""
-        Dear {task.assigned_to},
-
-        This is a reminder that the following task is due soon:
+        subject = f"Reminder: Task '{task.title}' Due Soon"
 
-        Title: {task.title}
-        Description: {task.description}
-        Deadline: {task.deadline}
-        Priority: {task.priority.name}
-
-        Please ensure this task is completed on time.
+        try:
+            for header in (sender_email, receiver_email, subject):
+                if '\r' in header or '\n' in header:
+                    raise ValueError(f"Header value {header!r} contains a line break")
+            if not subject.isascii():
+                subject = Header(subject, 'utf-8').encode(linesep='\r\n')
+            message = EMAIL_TEMPLATE.format(
+                sender=sender_email,
+                receiver=receiver_email,
+                subject=subject,
+                name=task.assigned_to,
+                title=task.title,
+                description=task.description,
+                deadline=task.deadline,
+                priority=task.priority.name
+            ).encode('utf-8')
+
+            if server is None:
+                with self._smtp_login() as standalone_server:
+                    standalone_server.sendmail(sender_email, receiver_email, message)
+            else:
+                server.sendmail(sender_email, receiver_email, message)
+            print(f"Reminder email sent to {task.assigned_to}")
+        except smtplib.SMTPServerDisconnected as e:
+            # A shared connection is reopened by the caller.
+            if server is not None:
+                raise
+            print(f"Failed to send email: {str(e)}")
+        except Exception as e:
+            print(f"Failed to send email: {str(e)}")
 
-        Best regards,
-        Task Management System
-        """
+    def send_reminders(self):
+        cutoff = datetime.date.today() + datetime.timedelta(days=2)
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT {TASK_COLUMNS} FROM tasks WHERE deadline <= ? AND status != 'Completed'",
+                       (cutoff.isoformat(),))
+        upcoming_tasks = [self._row_to_task(row) for row in cursor.fetchall()]
+        if not upcoming_tasks:
+            return
 
-        message.attach(MIMEText(body, "plain"))
+        if not self.config['EMAIL']['sender_email'] or not self.config['EMAIL']['sender_password']:
+            print("Email configuration is not set up. Please use the 'Configure Email' option in the main menu.")
+            return
 
+        # Log in once up front so bad credentials stop the batch after a single attempt.
         try:
-            with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
-                server.login(sender_email, sender_password)
-                server.sendmail(sender_email, receiver_email, message.as_string())
-            print(f"Reminder email sent to {task.assigned_to}")
+            server = self._smtp_login()
         except Exception as e:
             print(f"Failed to send email: {str(e)}")
+            return
 
-    def send_reminders(self):
-        today = datetime.date.today()
-        upcoming_tasks = [task for task in self.tasks if (task.deadline - today).days <= 2 and task.status != "Completed"]
-        for task in upcoming_tasks:
-            self.send_reminder_email(task)
+        local = threading.local()
+        servers = [server]
+        idle = [server]
+        auth_failed = threading.Event()
+        try:
+            with ThreadPoolExecutor(max_workers=REMINDER_WORKERS) as executor:
+                futures = [executor.submit(self._send_reminder_worker, task, local, servers, idle, auth_failed)
+                           for task in upcoming_tasks]
+                for future in futures:
+                    try:
+                        future.result()
+                    except smtplib.SMTPAuthenticationError as e:
+                        print(f"Failed to send email: {str(e)}")
+                        for pending in futures:
+                            pending.cancel()
+                        break
+                    except Exception as e:
+                        print(f"Failed to send email: {str(e)}")
+        finally:
+            for server in servers:
+                self._smtp_logout(server)
+
+    def _send_reminder_worker(self, task: Task, local: threading.local, servers: List[smtplib.SMTP_SSL],
+                              idle: List[smtplib.SMTP_SSL], auth_failed: threading.Event):
+        # Each worker thread logs in once and keeps its connection for the rest of the batch;
+        # the first worker picks up the connection opened by send_reminders.
+        if auth_failed.is_set():
+            return
+        if getattr(local, 'server', None) is None:
+            try:
+                local.server = idle.pop()
+            except IndexError:
+                local.server = self._worker_login(servers, auth_failed)
+        try:
+            self.send_reminder_email(task, local.server)
+        except smtplib.SMTPServerDisconnected:
+            local.server.close()
+            local.server = self._worker_login(servers, auth_failed)
+            self.send_reminder_email(task, local.server)
+
+    def _worker_login(self, servers: List[smtplib.SMTP_SSL], auth_failed: threading.Event) -> smtplib.SMTP_SSL:
+        try:
+            server = self._smtp_login()
+        except smtplib.SMTPAuthenticationError:
+            auth_failed.set()
+            raise
+        servers.append(server)
+        return server
 
 class CLI:
     def __init__(self):